@@ -49,8 +49,10 @@ CREATE INDEX IF NOT EXISTS idx_network_events_event_timestamp ON network_events(
 CREATE INDEX IF NOT EXISTS idx_revenue_customer_id ON revenue(customer_id);
 CREATE INDEX IF NOT EXISTS idx_revenue_transaction_date ON revenue(transaction_date);
 
--- Create views for common analytics queries
-CREATE OR REPLACE VIEW customer_summary AS
+-- Create materialized views for common analytics queries
+-- customer_summary is refreshed periodically by the MCP server
+-- (REFRESH MATERIALIZED VIEW CONCURRENTLY needs the unique index below)
+CREATE MATERIALIZED VIEW IF NOT EXISTS customer_summary AS
 SELECT 
     c.customer_id,
     c.customer_name,
@@ -64,3 +66,36 @@ FROM customers c
 LEFT JOIN network_events ne ON c.customer_id = ne.customer_id
 LEFT JOIN revenue r ON c.customer_id = r.customer_id
 GROUP BY c.customer_id, c.customer_name, c.email, c.account_type, c.status, c.monthly_fee;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_customer_summary_customer_id ON customer_summary(customer_id);
+-- Covers "SELECT * ... ORDER BY total_revenue DESC" so it runs as an index-only scan with no sort
+CREATE INDEX IF NOT EXISTS idx_customer_summary_total_revenue ON customer_summary(total_revenue DESC)
+    INCLUDE (customer_id, customer_name, email, account_type, status, monthly_fee, total_events);
+
+-- Announce schema changes so the MCP server can drop its cached table
+-- descriptions (creating event triggers requires a superuser). Temporary
+-- objects, such as those REFRESH ... CONCURRENTLY creates, are ignored.
+CREATE OR REPLACE FUNCTION notify_ddl() RETURNS event_trigger AS $$
+BEGIN
+    IF tg_tag <> 'REFRESH MATERIALIZED VIEW' AND EXISTS (
+        SELECT 1 FROM pg_event_trigger_ddl_commands()
+        WHERE schema_name IS NULL OR schema_name NOT LIKE 'pg\_temp%'
+    ) THEN
+        PERFORM pg_notify('pg_ddl', tg_tag);
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- DROP commands are reported at sql_drop rather than ddl_command_end
+CREATE OR REPLACE FUNCTION notify_ddl_drop() RETURNS event_trigger AS $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_event_trigger_dropped_objects() WHERE NOT is_temporary) THEN
+        PERFORM pg_notify('pg_ddl', tg_tag);
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP EVENT TRIGGER IF EXISTS notify_ddl;
+CREATE EVENT TRIGGER notify_ddl ON ddl_command_end EXECUTE FUNCTION notify_ddl();
+DROP EVENT TRIGGER IF EXISTS notify_ddl_drop;
+CREATE EVENT TRIGGER notify_ddl_drop ON sql_drop EXECUTE FUNCTION notify_ddl_drop();
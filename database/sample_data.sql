@@ -76,3 +76,6 @@ INSERT INTO revenue (customer_id, transaction_date, amount, transaction_type, pa
 (8, '2024-10-01', 49.99, 'subscription', 'credit_card', 'Monthly Standard subscription'),
 (9, '2024-10-01', 79.99, 'subscription', 'credit_card', 'Monthly Premium subscription'),
 (10, '2024-10-01', 29.99, 'subscription', 'debit_card', 'Monthly Basic subscription');
+
+-- Populate materialized views with the sample data
+REFRESH MATERIALIZED VIEW customer_summary;
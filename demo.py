@@ -9,7 +9,7 @@ import os
 # Add src directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "src"))
 
-from database import DatabaseConnection
+from database import db
 
 
 def print_section(title: str):
@@ -40,9 +40,6 @@ async def test_mcp_tools():
     
     print_section("MCP Server Demo - PostgreSQL Integration")
     
-    # Initialize database connection
-    db = DatabaseConnection()
-    
     # Test 1: Database connection
     print_section("Test 1: Database Connection")
     if db.test_connection():
@@ -53,20 +50,10 @@ async def test_mcp_tools():
     
     # Test 2: List all tables
     print_section("Test 2: List Tables")
-    query = """
-        SELECT table_name
-        FROM information_schema.tables
-        WHERE table_schema = 'public'
-        AND table_type = 'BASE TABLE'
-        ORDER BY table_name;
-    """
-    tables = db.execute_query(query)
+    tables = db.execute_query("EXECUTE list_public_tables")
     print("Available tables:")
     for table in tables:
-        # Get row count
-        count_query = f"SELECT COUNT(*) as count FROM {table['table_name']}"
-        count = db.execute_query(count_query)[0]['count']
-        print(f"  - {table['table_name']} ({count} rows)")
+        print(f"  - {table['table_name']} ({table['row_count']} rows)")
     
     # Test 3: Query customers
     print_section("Test 3: Query Customers")
@@ -140,24 +127,27 @@ async def test_mcp_tools():
     
     # Test 8: Network quality analysis
     print_section("Test 8: Network Quality Analysis")
-    query = """
-        SELECT 
-            network_quality,
-            COUNT(*) as event_count,
-            SUM(data_usage_mb) as total_data_mb,
-            AVG(data_usage_mb) as avg_data_mb
-        FROM network_events
-        WHERE data_usage_mb IS NOT NULL
-        GROUP BY network_quality
-        ORDER BY event_count DESC
-    """
-    results = db.execute_query(query)
+    # Filtered, grouped and formatted in SQL, so only one row per quality
+    # level leaves the database
+    results = db.aggregate(
+        "network_events",
+        ["network_quality"],
+        {
+            "event_count": ("count", "*"),
+            "total_data_mb": ("sum", "data_usage_mb"),
+            "avg_data_mb": ("avg", "data_usage_mb"),
+        },
+        order_by="event_count",
+        descending=True,
+        not_null=["data_usage_mb"],
+        initcap=["network_quality"],
+    )
     print("\nNetwork quality distribution:")
     for row in results:
-        print(f"\n{row['network_quality'].capitalize()} Quality:")
+        print(f"\n{row['network_quality']} Quality:")
         print(f"  Events: {row['event_count']}")
-        print(f"  Total Data: {float(row['total_data_mb']):.2f} MB")
-        print(f"  Avg Data per Event: {float(row['avg_data_mb']):.2f} MB")
+        print(f"  Total Data: {row['total_data_mb']:.2f} MB")
+        print(f"  Avg Data per Event: {row['avg_data_mb']:.2f} MB")
     
     print_section("Demo Completed Successfully!")
     print("\nThe MCP server is ready to use with the following tools:")
@@ -165,6 +155,7 @@ async def test_mcp_tools():
     print("  2. list_tables - List all database tables")
     print("  3. describe_table - Get table schema")
     print("  4. get_customer_summary - Get customer analytics")
+    print("  5. refresh_customer_summary - Rebuild the customer summary")
     print("\nNext steps:")
     print("  - Start the MCP server: python src/server.py")
     print("  - Connect your AI agent to the MCP server")
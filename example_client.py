@@ -11,14 +11,21 @@ import os
 # Add src directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "src"))
 
-from database import DatabaseConnection
+from database import db
+from query_parser import parse_select
 
 
 class SimpleMCPClient:
     """A simple MCP client simulator for demonstration purposes"""
     
     def __init__(self):
-        self.db = DatabaseConnection()
+        self.db = db
+        self.tools = {
+            "query_database": self.query_database,
+            "list_tables": self.list_tables,
+            "describe_table": self.describe_table,
+            "get_customer_summary": self.get_customer_summary,
+        }
     
     def call_tool(self, tool_name: str, arguments: dict) -> dict:
         """
@@ -34,67 +41,65 @@ class SimpleMCPClient:
         print(f"\n📞 Calling MCP Tool: {tool_name}")
         print(f"📋 Arguments: {json.dumps(arguments, indent=2)}")
         
-        try:
-            if tool_name == "query_database":
-                query = arguments.get("query", "")
-                if not query.strip().upper().startswith("SELECT"):
-                    return {"error": "Only SELECT queries are allowed"}
-                
-                results = self.db.execute_query(query)
-                return {
-                    "success": True,
-                    "rows": len(results),
-                    "data": results
-                }
-            
-            elif tool_name == "list_tables":
-                query = """
-                    SELECT table_name
-                    FROM information_schema.tables
-                    WHERE table_schema = 'public'
-                    AND table_type = 'BASE TABLE'
-                    ORDER BY table_name;
-                """
-                results = self.db.execute_query(query)
-                
-                tables = []
-                for result in results:
-                    table_name = result['table_name']
-                    count_query = f"SELECT COUNT(*) as count FROM {table_name}"
-                    count_result = self.db.execute_query(count_query)
-                    tables.append({
-                        "table_name": table_name,
-                        "row_count": count_result[0]['count']
-                    })
-                
-                return {"success": True, "tables": tables}
-            
-            elif tool_name == "describe_table":
-                table_name = arguments.get("table_name", "")
-                query = """
-                    SELECT column_name, data_type, is_nullable
-                    FROM information_schema.columns
-                    WHERE table_schema = 'public'
-                    AND table_name = %s
-                    ORDER BY ordinal_position;
-                """
-                results = self.db.execute_query(query, (table_name,))
-                return {
-                    "success": True,
-                    "table_name": table_name,
-                    "columns": results
-                }
-            
-            elif tool_name == "get_customer_summary":
-                query = "SELECT * FROM customer_summary ORDER BY customer_id"
-                results = self.db.execute_query(query)
-                return {"success": True, "customers": results}
-            
-            else:
-                return {"error": f"Unknown tool: {tool_name}"}
+        handler = self.tools.get(tool_name)
+        if handler is None:
+            return {"error": f"Unknown tool: {tool_name}"}
         
+        try:
+            return handler(arguments)
         except Exception as e:
             return {"error": str(e), "type": type(e).__name__}
+    
+    def query_database(self, arguments: dict) -> dict:
+        """Run a read-only SQL query"""
+        query = arguments.get("query", "")
+        if parse_select(query) is None:
+            return {"error": "Only SELECT queries are allowed"}
+        
+        results = self.db.execute_query(query)
+        return {
+            "success": True,
+            "rows": len(results),
+            "data": results
+        }
+    
+    def list_tables(self, arguments: dict) -> dict:
+        """List public tables with their estimated (or exact) row counts"""
+        tables = self.db.execute_query("EXECUTE list_public_tables")
+        
+        if arguments.get("exact"):
+            counts = self.db.execute_selects([
+                self.db.row_count_statement(table["table_name"])
+                for table in tables
+            ])
+            tables = [
+                {**table, "row_count": count[0]["count"]}
+                for table, count in zip(tables, counts)
+            ]
+        return {"success": True, "tables": tables}
+    
+    def describe_table(self, arguments: dict) -> dict:
+        """Return the column definitions of a table"""
+        table_name = arguments.get("table_name", "")
+        query = """
+            SELECT column_name, data_type, is_nullable
+            FROM information_schema.columns
+            WHERE table_schema = 'public'
+            AND table_name = %s
+            ORDER BY ordinal_position;
+        """
+        results = self.db.execute_query(query, (table_name,))
+        return {
+            "success": True,
+            "table_name": table_name,
+            "columns": results
+        }
+    
+    def get_customer_summary(self, arguments: dict) -> dict:
+        """Return the customer_summary view"""
+        query = "SELECT * FROM customer_summary ORDER BY customer_id"
+        results = self.db.execute_query(query)
+        return {"success": True, "customers": results}
 
 
 def print_response(response: dict):
@@ -0,0 +1,66 @@
+"""
+Arrow IPC encoding of query results (requires the optional pyarrow package)
+"""
+import base64
+from typing import List, Optional, Sequence
+
+import orjson
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:  # installed with the "arrow" extra
+    pa = None
+
+FORMAT = "arrow-ipc-b64"
+
+
+def available() -> bool:
+    """Returns True if pyarrow is installed"""
+    return pa is not None
+
+
+def _column(values: List[object]) -> "pa.Array":
+    """Build one Arrow column, letting pyarrow infer the type"""
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed or nested values (e.g. json objects with differing keys) have
+        # no single Arrow type; send them as JSON text
+        return pa.array([_as_text(v) for v in values])
+
+
+def _as_text(value: object) -> Optional[str]:
+    """Text form of one value: JSON for objects, arrays and booleans, else str()"""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list, tuple, bool)):
+        # Same encoder and fallback as server._text, so clients can parse it
+        return orjson.dumps(value, default=str).decode()
+    return str(value)
+
+
+def encode(columns: Sequence[str], rows: Sequence[tuple]) -> str:
+    """
+    Encode a result set as a base64 Arrow IPC stream
+
+    Args:
+        columns: Column names, in column order
+        rows: Row tuples as returned by execute_query_raw / execute_query_copy
+
+    Returns:
+        Base64 text of an IPC stream holding a single record batch
+    """
+    if pa is None:
+        raise RuntimeError("Arrow output requires pyarrow (pip install pyarrow)")
+
+    if rows:
+        arrays = [_column(list(values)) for values in zip(*rows)]
+    else:
+        arrays = [pa.array([], type=pa.null()) for _ in columns]
+    table = pa.Table.from_arrays(arrays, names=list(columns))
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=max(len(rows), 1))
+    return base64.b64encode(sink.getvalue().to_pybytes()).decode("ascii")
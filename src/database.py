@@ -1,17 +1,161 @@
 """
 Database connection and utility functions for PostgreSQL
 """
+import asyncio
+import functools
+import hashlib
+import io
 import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import psycopg2
+import psycopg2.errors
+from cachetools import TTLCache
+from psycopg2 import sql
+from psycopg2.extensions import encodings
 from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool
 from dotenv import load_dotenv
 
+import copy_binary
+
+__all__ = ["db", "DatabaseConnection", "PREPARED_STATEMENTS"]
+
 # Load environment variables
 load_dotenv()
 
+# Aggregates accepted by DatabaseConnection.aggregate, mapped to the cast
+# applied to their result so callers receive plain Python numbers
+_AGGREGATE_CASTS = {
+    "count": None,
+    "sum": "float8",
+    "avg": "float8",
+    "min": None,
+    "max": None,
+}
+
+# Queries whose result depends on when (or how often) they run are never cached.
+# Calls of VOLATILE functions (pg_proc.provolatile = 'v') are detected from the
+# catalog as well; this list covers what that misses (keyword forms, STABLE
+# but per-transaction functions) and anything the catalog lookup can't reach.
+_VOLATILE_SQL = re.compile(
+    r"\b(now|current_timestamp|current_date|current_time|localtime|localtimestamp"
+    r"|clock_timestamp|statement_timestamp|transaction_timestamp|timeofday"
+    r"|random|gen_random_uuid|uuid_generate_\w+|nextval|currval|lastval|setval"
+    r"|txid_current\w*|pg_current_xact_id\w*|pg_notify|pg_(try_)?advisory_\w+"
+    r"|pg_sleep\w*|set_config)\b",
+    re.IGNORECASE,
+)
+
+# Unquoted names directly followed by "(", i.e. (possibly) function calls
+_FUNCTION_CALL = re.compile(r"\b([a-z_][a-z0-9_$]*)\s*\(", re.IGNORECASE)
+
+_VOLATILE_FUNCTIONS_SQL = (
+    "SELECT DISTINCT lower(proname) FROM pg_proc WHERE provolatile = 'v'"
+)
+
+# Hot catalog lookups, prepared once on every pooled connection so repeated
+# calls skip parsing and planning. Name -> (parameter types, statement).
+# All of them are read-only, which lets EXECUTE of them use the result cache.
+PREPARED_STATEMENTS = {
+    "describe_table": (
+        ("text",),
+        """
+        SELECT 
+            column_name,
+            data_type,
+            character_maximum_length,
+            is_nullable,
+            column_default
+        FROM information_schema.columns
+        WHERE table_schema = 'public'
+        AND table_name = $1
+        ORDER BY ordinal_position
+        """,
+    ),
+    "list_public_tables": (
+        (),
+        """
+        SELECT 
+            t.table_name,
+            (SELECT COUNT(*) 
+             FROM information_schema.columns 
+             WHERE table_schema = t.table_schema 
+             AND table_name = t.table_name) as column_count,
+            -- Planner estimate, or the live-tuple count for tables that
+            -- have never been analyzed (reltuples = -1)
+            COALESCE(NULLIF(c.reltuples, -1)::bigint, s.n_live_tup, 0) as row_count
+        FROM information_schema.tables t
+        JOIN pg_namespace n ON n.nspname = t.table_schema
+        JOIN pg_class c ON c.relnamespace = n.oid AND c.relname = t.table_name
+        LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+        WHERE t.table_schema = 'public'
+        AND t.table_type = 'BASE TABLE'
+        ORDER BY t.table_name
+        """,
+    ),
+}
+
+_EXECUTE_STATEMENT = re.compile(r"\s*EXECUTE\s+(\w+)", re.IGNORECASE)
+
+
+def _log_reload_failure(future: asyncio.Future):
+    """Report a failed background reload; the previous function list stays in use"""
+    if not future.cancelled() and future.exception() is not None:
+        print(
+            f"Reloading volatile functions failed: {future.exception()}",
+            file=sys.stderr,
+        )
+
+
+class _RetainingConnectionPool(ThreadedConnectionPool):
+    """
+    Thread-safe pool that keeps up to maxconn idle connections open
+
+    psycopg2 closes a returned connection once minconn are already idle, so
+    every call beyond minconn concurrent ones would pay a fresh TCP/auth
+    handshake. Here minconn only sets how many connections open up front.
+    """
+
+    def __init__(self, minconn: int, maxconn: int, *args, **kwargs):
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        # _putconn retains returned connections while fewer than minconn idle
+        self.minconn = maxconn
+
+
+class _PreparingConnectionPool(_RetainingConnectionPool):
+    """
+    Connection pool that runs PREPARE for PREPARED_STATEMENTS on each new connection
+
+    Connections are retained for the life of the pool, so the statements are
+    parsed and planned once per connection rather than once per call.
+    """
+
+    def _connect(self, key=None):
+        conn = super()._connect(key)
+        try:
+            with conn.cursor() as cursor:
+                for name, (param_types, statement) in PREPARED_STATEMENTS.items():
+                    params = f"({', '.join(param_types)})" if param_types else ""
+                    cursor.execute(f"PREPARE {name}{params} AS {statement}")
+            conn.commit()
+        except Exception:
+            # Don't leave a half-prepared connection registered with the pool
+            if key is not None:
+                del self._used[key]
+                del self._rused[id(conn)]
+            else:
+                self._pool.remove(conn)
+            conn.close()
+            raise
+        return conn
+
 
 class DatabaseConnection:
     """Manages PostgreSQL database connections"""
@@ -22,48 +166,674 @@ class DatabaseConnection:
         self.database = os.getenv("POSTGRES_DB", "analytics_db")
         self.user = os.getenv("POSTGRES_USER", "analytics_user")
         self.password = os.getenv("POSTGRES_PASSWORD", "analytics_password")
+        self.pool_min = int(os.getenv("PG_POOL_MIN", "2"))
+        self.pool_max = int(os.getenv("PG_POOL_MAX", "10"))
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        # One worker per pooled connection so async callers never exhaust the pool
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.pool_max, thread_name_prefix="db"
+        )
+        self._cache = TTLCache(
+            maxsize=512, ttl=int(os.getenv("QUERY_CACHE_TTL", "60"))
+        )
+        self._cache_lock = threading.Lock()
+        # Names of VOLATILE functions, loaded with the pool and reloaded on DDL
+        self._volatile_functions: frozenset = frozenset()
+        # table name -> (expiry, columns). Entries are dropped on DDL when
+        # watch_ddl is running; the TTL bounds staleness when it is not.
+        self._schema_cache: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+        self._schema_generation = 0
+        self.schema_cache_ttl = float(os.getenv("SCHEMA_CACHE_TTL", "300"))
+        # Query -> (column names, type OIDs) from the execute_query_copy probe,
+        # dropped on DDL like the schema cache
+        self._copy_shapes = TTLCache(maxsize=512, ttl=self.schema_cache_ttl)
+        # True while watch_ddl holds its LISTEN connection
+        self._ddl_listening = False
 
     def get_connection_string(self) -> str:
         """Returns the PostgreSQL connection string"""
         return f"host={self.host} port={self.port} dbname={self.database} user={self.user} password={self.password}"
 
+    def _get_pool(self) -> ThreadedConnectionPool:
+        """Returns the connection pool, creating it on first use"""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    pool = _PreparingConnectionPool(
+                        minconn=self.pool_min,
+                        maxconn=self.pool_max,
+                        host=self.host,
+                        port=self.port,
+                        database=self.database,
+                        user=self.user,
+                        password=self.password,
+                    )
+                    # Loaded before the pool is published, so no query is ever
+                    # cache-checked against an empty list
+                    conn = pool.getconn()
+                    try:
+                        self._volatile_functions = self._fetch_volatile_functions(conn)
+                    finally:
+                        pool.putconn(conn)
+                    self._pool = pool
+        return self._pool
+
+    @staticmethod
+    def _fetch_volatile_functions(conn) -> frozenset:
+        """Names of every VOLATILE function in the database, lower-cased"""
+        with conn.cursor() as cursor:
+            cursor.execute(_VOLATILE_FUNCTIONS_SQL)
+            return frozenset(name for (name,) in cursor.fetchall())
+
+    def reload_volatile_functions(self):
+        """Re-read the VOLATILE function names, e.g. after CREATE FUNCTION"""
+        with self.get_connection() as conn:
+            self._volatile_functions = self._fetch_volatile_functions(conn)
+
     @contextmanager
     def get_connection(self):
-        """Context manager for database connections"""
-        conn = None
+        """Context manager that borrows a connection from the pool"""
+        pool = self._get_pool()
+        conn = pool.getconn()
         try:
-            conn = psycopg2.connect(
-                host=self.host,
-                port=self.port,
-                database=self.database,
-                user=self.user,
-                password=self.password,
-            )
             yield conn
         finally:
-            if conn:
-                conn.close()
+            # putconn rolls back any open transaction before reuse
+            pool.putconn(conn)
+
+    def close_all(self):
+        """Close every pooled connection"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
 
-    def execute_query(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
+    def execute_query(
+        self, query: str, params: tuple = None, cache_key: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
         """
         Execute a SQL query and return results as a list of dictionaries
 
         Args:
             query: SQL query to execute
             params: Optional parameters for parameterized queries
+            cache_key: Text to key the result cache on instead of the query,
+                e.g. a normalized form of an already validated read-only query
 
         Returns:
-            List of dictionaries representing query results
+            List of dictionaries representing query results. Results of
+            SELECT queries are cached for QUERY_CACHE_TTL seconds and shared
+            between callers, so they must not be mutated.
+        """
+        key = self._cache_key(query, params, cache_key=cache_key)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        with self.get_connection() as conn:
+            return self._execute_on(conn, query, params, key)
+
+    def _execute_on(
+        self, conn, query: str, params: tuple, key: Optional[tuple]
+    ) -> List[Dict[str, Any]]:
+        """Run one query on a borrowed connection, caching SELECT results"""
+        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute(query, params)
+            if cursor.description:  # SELECT query
+                # RealDictRow is already a dict, so rows are returned as-is
+                results = cursor.fetchall()
+                if key is not None:
+                    with self._cache_lock:
+                        self._cache[key] = results
+                return results
+            else:  # INSERT, UPDATE, DELETE
+                conn.commit()
+                self.invalidate()
+                return [{"affected_rows": cursor.rowcount}]
+
+    def _execute_composed(
+        self, statement: sql.Composable, params: tuple = None
+    ) -> List[Dict[str, Any]]:
+        """
+        execute_query for a psycopg2.sql composition
+
+        The statement is rendered to text (so it can use the result cache) on
+        the same pooled connection that then runs it.
+        """
+        with self.get_connection() as conn:
+            query = statement.as_string(conn)
+            key = self._cache_key(query, params)
+            cached = self._cached(key)
+            if cached is not None:
+                return cached
+            return self._execute_on(conn, query, params, key)
+
+    def _cached(self, key: Optional[tuple]) -> Any:
+        """Returns the cached result for a cache key, or None"""
+        if key is None:
+            return None
+        with self._cache_lock:
+            return self._cache.get(key)
+
+    def execute_query_raw(
+        self, query: str, params: tuple = None, cache_key: Optional[str] = None
+    ) -> Tuple[Tuple[str, ...], List[tuple]]:
+        """
+        Execute a SQL query and return results in columnar form
+
+        Skips building a dictionary per row, which makes it the cheaper option
+        for large result sets.
+
+        Args:
+            query: SQL query to execute
+            params: Optional parameters for parameterized queries
+            cache_key: Text to key the result cache on instead of the query,
+                e.g. a normalized form of an already validated read-only query
+
+        Returns:
+            Tuple of (column names, list of row tuples). Cached like
+            execute_query, so the rows must not be mutated.
         """
+        key = self._cache_key(query, params, shape="raw", cache_key=cache_key)
+        if key is not None:
+            with self._cache_lock:
+                cached = self._cache.get(key)
+            if cached is not None:
+                return cached
+
         with self.get_connection() as conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            with conn.cursor() as cursor:
                 cursor.execute(query, params)
                 if cursor.description:  # SELECT query
-                    results = cursor.fetchall()
-                    return [dict(row) for row in results]
+                    columns = tuple(column.name for column in cursor.description)
+                    result = (columns, cursor.fetchall())
+                    if key is not None:
+                        with self._cache_lock:
+                            self._cache[key] = result
+                    return result
                 else:  # INSERT, UPDATE, DELETE
                     conn.commit()
-                    return [{"affected_rows": cursor.rowcount}]
+                    self.invalidate()
+                    return ("affected_rows",), [(cursor.rowcount,)]
+
+    def execute_query_copy(
+        self, query: str, params: tuple = None, cache_key: Optional[str] = None
+    ) -> Tuple[Tuple[str, ...], List[tuple]]:
+        """
+        Execute a SELECT through COPY ... TO STDOUT (FORMAT binary)
+
+        Large result sets skip psycopg2's per-value text parsing; rows are
+        decoded straight from the binary COPY stream. Queries returning a
+        column type the decoder does not know fall back to a regular fetch.
+        The column types come from a LIMIT 0 probe, which is skipped for
+        statements seen before while the DDL listener is running (see
+        _copy_shape).
+
+        Args:
+            query: A single SELECT statement
+            params: Optional parameters for parameterized queries
+            cache_key: Text to key the result cache on instead of the query,
+                e.g. a normalized form of an already validated read-only query
+
+        Returns:
+            Tuple of (column names, list of row tuples), cached like
+            execute_query_raw
+        """
+        key = self._cache_key(query, params, shape="copy", cache_key=cache_key)
+        if key is not None:
+            with self._cache_lock:
+                cached = self._cache.get(key)
+            if cached is not None:
+                return cached
+
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                statement = cursor.mogrify(query, params).strip().rstrip(b";")
+                columns, type_oids = self._copy_shape(cursor, statement)
+                try:
+                    rows = self._fetch_copy(conn, cursor, statement, type_oids)
+                except copy_binary.ShapeError:
+                    # The remembered shape predates a schema change; describe
+                    # the query again and retry once
+                    columns, type_oids = self._copy_shape(
+                        cursor, statement, refresh=True
+                    )
+                    rows = self._fetch_copy(conn, cursor, statement, type_oids)
+
+        result = (columns, rows)
+        if key is not None:
+            with self._cache_lock:
+                self._cache[key] = result
+        return result
+
+    def _copy_shape(
+        self, cursor, statement: bytes, refresh: bool = False
+    ) -> Tuple[Tuple[str, ...], List[int]]:
+        """
+        Column names and type OIDs of a statement, from a LIMIT 0 probe
+
+        Binary COPY carries no type information, so execute_query_copy needs
+        the column types up front. They are remembered per statement only
+        while watch_ddl is connected, since only then will a schema change
+        reliably clear them.
+        """
+        if not refresh and self._ddl_listening:
+            with self._cache_lock:
+                shape = self._copy_shapes.get(statement)
+            if shape is not None:
+                return shape
+
+        # Newlines keep a trailing -- comment from swallowing the wrapper
+        cursor.execute(b"SELECT * FROM (\n" + statement + b"\n) AS _q LIMIT 0")
+        shape = (
+            tuple(column.name for column in cursor.description),
+            [column.type_code for column in cursor.description],
+        )
+        with self._cache_lock:
+            self._copy_shapes[statement] = shape
+        return shape
+
+    @staticmethod
+    def _fetch_copy(
+        conn, cursor, statement: bytes, type_oids: List[int]
+    ) -> List[tuple]:
+        """Fetch a statement's rows via binary COPY, or normally if unsupported"""
+        if not copy_binary.supports(type_oids):
+            cursor.execute(statement)
+            return cursor.fetchall()
+        buffer = io.BytesIO()
+        cursor.copy_expert(
+            b"COPY (\n" + statement + b"\n) TO STDOUT (FORMAT binary)", buffer
+        )
+        return copy_binary.decode(
+            buffer.getvalue(), type_oids, encodings[conn.encoding]
+        )
+
+    def _cache_key(
+        self,
+        query: str,
+        params: tuple = None,
+        shape: str = "dicts",
+        cache_key: Optional[str] = None,
+    ) -> Optional[tuple]:
+        """Returns the result-cache key for a query, or None if it must not be cached"""
+        # A caller-supplied key vouches for the query being read-only
+        if cache_key is None and not self._is_read_only(query):
+            return None
+        if _VOLATILE_SQL.search(query):
+            return None
+        # The first query in a process may arrive before the pool exists;
+        # creating it loads the VOLATILE function names
+        self._get_pool()
+        volatile = self._volatile_functions
+        if any(
+            name.lower() in volatile for name in _FUNCTION_CALL.findall(query)
+        ):
+            return None
+        text = cache_key if cache_key is not None else " ".join(query.split())
+        digest = hashlib.blake2b(text.encode(), digest_size=16).digest()
+        key = (digest, params, shape)
+        try:
+            hash(key)
+        except TypeError:  # e.g. list or dict params
+            return None
+        return key
+
+    def aggregate(
+        self,
+        table: str,
+        group_by: Sequence[str],
+        aggregates: Dict[str, Tuple[str, str]],
+        order_by: Optional[str] = None,
+        descending: bool = False,
+        where: Optional[Dict[str, Any]] = None,
+        not_null: Sequence[str] = (),
+        initcap: Sequence[str] = (),
+    ) -> List[Dict[str, Any]]:
+        """
+        Group and aggregate a table in SQL, returning one row per group
+
+        Only the (small) grouped result crosses the wire. SUM and AVG are
+        cast to float8 so values arrive as floats rather than Decimals.
+
+        Args:
+            table: Table in the public schema
+            group_by: Columns to group by
+            aggregates: Output name -> (function, column), where function is
+                count, sum, avg, min or max and column may be "*" for count
+            order_by: Output name (a group column or aggregate) to sort by
+            descending: Sort in descending order
+            where: Column -> value; only rows equal on every column are
+                aggregated (values are sent as query parameters)
+            not_null: Columns whose NULL rows are left out
+            initcap: Group columns returned with INITCAP() applied
+
+        Returns:
+            List of dictionaries, one per group
+
+        Example:
+            db.aggregate(
+                "network_events",
+                ["network_quality"],
+                {"events": ("count", "*"), "total_mb": ("sum", "data_usage_mb")},
+                order_by="events",
+                descending=True,
+                not_null=["data_usage_mb"],
+                initcap=["network_quality"],
+            )
+        """
+        if not set(initcap) <= set(group_by):
+            raise ValueError("initcap only applies to group_by columns")
+        columns = [
+            sql.SQL("INITCAP({0}) AS {0}").format(sql.Identifier(column))
+            if column in initcap
+            else sql.Identifier(column)
+            for column in group_by
+        ]
+        for name, (function, column) in aggregates.items():
+            function = function.lower()
+            if function not in _AGGREGATE_CASTS:
+                raise ValueError(f"Unsupported aggregate function: {function}")
+            if column == "*":
+                if function != "count":
+                    raise ValueError(f"{function}(*) is not valid SQL")
+                argument = sql.SQL("*")
+            else:
+                argument = sql.Identifier(column)
+            expression = sql.SQL("{}({})").format(sql.SQL(function), argument)
+            if _AGGREGATE_CASTS[function]:
+                expression = sql.SQL("{}::{}").format(
+                    expression, sql.SQL(_AGGREGATE_CASTS[function])
+                )
+            columns.append(
+                sql.SQL("{} AS {}").format(expression, sql.Identifier(name))
+            )
+
+        statement = sql.SQL("SELECT {} FROM {}").format(
+            sql.SQL(", ").join(columns), sql.Identifier("public", table)
+        )
+        where = where or {}
+        conditions = [
+            sql.SQL("{} = %s").format(sql.Identifier(column)) for column in where
+        ]
+        conditions += [
+            sql.SQL("{} IS NOT NULL").format(sql.Identifier(column))
+            for column in not_null
+        ]
+        if conditions:
+            statement += sql.SQL(" WHERE {}").format(
+                sql.SQL(" AND ").join(conditions)
+            )
+        if group_by:
+            statement += sql.SQL(" GROUP BY {}").format(
+                sql.SQL(", ").join(sql.Identifier(column) for column in group_by)
+            )
+        if order_by:
+            statement += sql.SQL(" ORDER BY {} {}").format(
+                sql.Identifier(order_by), sql.SQL("DESC" if descending else "ASC")
+            )
+
+        return self._execute_composed(statement, tuple(where.values()) or None)
+
+    def row_count_statement(self, table_name: str) -> Tuple[Any, Optional[tuple]]:
+        """
+        Build the (query, params) pair that counts the rows of a public table
+
+        This is the exact COUNT(*) form, which scans the table; the name is
+        quoted with psycopg2.sql.Identifier. Estimated counts come from the
+        list_public_tables prepared statement.
+
+        Args:
+            table_name: Table in the public schema
+
+        Returns:
+            Tuple of (query, params) whose single row has a "count" column
+        """
+        query = sql.SQL("SELECT COUNT(*) as count FROM ONLY {}").format(
+            sql.Identifier("public", table_name)
+        )
+        return query, None
+
+    def refresh_materialized_view(self, name: str, concurrently: bool = True):
+        """
+        Refresh a materialized view and drop cached results that may read it
+
+        Args:
+            name: Materialized view in the public schema
+            concurrently: Refresh without blocking readers (needs a unique
+                index on the view and that it has been populated once)
+        """
+        statement = sql.SQL(
+            "REFRESH MATERIALIZED VIEW CONCURRENTLY {}"
+            if concurrently
+            else "REFRESH MATERIALIZED VIEW {}"
+        ).format(sql.Identifier("public", name))
+        with self.get_connection() as conn:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(statement)
+            except psycopg2.errors.WrongObjectType as e:
+                # e.g. a database initialised when customer_summary was a plain view
+                raise RuntimeError(
+                    f"{name} is not a materialized view; recreate the database "
+                    "(docker compose down -v) to apply database/init.sql"
+                ) from e
+            conn.commit()
+        self.invalidate()
+
+    @staticmethod
+    def _is_read_only(query: str) -> bool:
+        """True for SELECTs and EXECUTEs of the (read-only) prepared statements"""
+        if query.lstrip().upper().startswith("SELECT"):
+            return True
+        execute = _EXECUTE_STATEMENT.match(query)
+        return execute is not None and execute.group(1).lower() in PREPARED_STATEMENTS
+
+    def invalidate(self):
+        """Drop every cached query result"""
+        with self._cache_lock:
+            self._cache.clear()
+
+    def invalidate_schema(self):
+        """Drop every cached table description and COPY result shape"""
+        with self._cache_lock:
+            # Descriptions fetched before this point must not be stored
+            self._schema_generation += 1
+            self._schema_cache.clear()
+            self._copy_shapes.clear()
+
+    def _cached_schema(self, table_name: str) -> Optional[List[Dict[str, Any]]]:
+        """Returns the memoized columns of a table, or None if absent or expired"""
+        entry = self._schema_cache.get(table_name)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def _fetch_schema(self, table_name: str) -> List[Dict[str, Any]]:
+        """Query a table's columns and memoize them unless DDL happened meanwhile"""
+        generation = self._schema_generation
+        with self.get_connection() as conn:
+            # Skips the result cache, which could hand back a pre-DDL answer
+            columns = self._execute_on(
+                conn, "EXECUTE describe_table(%s)", (table_name,), None
+            )
+        # Unknown tables aren't memoized, so one created later shows up at once
+        if columns:
+            expiry = time.monotonic() + self.schema_cache_ttl
+            with self._cache_lock:
+                if generation == self._schema_generation:
+                    self._schema_cache[table_name] = (expiry, columns)
+        return columns
+
+    def describe_table(self, table_name: str) -> List[Dict[str, Any]]:
+        """
+        Column definitions of a public table, memoized until the next DDL
+
+        Args:
+            table_name: Table in the public schema
+
+        Returns:
+            One dict per column (name, type, nullability, default), or an
+            empty list if no such table exists
+        """
+        columns = self._cached_schema(table_name)
+        if columns is None:
+            columns = self._fetch_schema(table_name)
+        return columns
+
+    def execute_selects(
+        self, statements: Sequence[Tuple[Any, Optional[tuple]]]
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Run several independent SELECTs in a single round-trip
+
+        psycopg2 has no libpq pipeline mode, so each statement is wrapped in a
+        json_agg() subquery and all of them are sent as one SELECT. Values come
+        back JSON-decoded (numbers, strings, booleans), which makes this best
+        suited to catalog lookups and counts rather than arbitrary result sets.
+
+        Args:
+            statements: (query, params) pairs; queries may be strings or
+                psycopg2.sql composables
+
+        Returns:
+            One list of row dictionaries per statement, in the same order
+        """
+        if not statements:
+            return []
+
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                parts = []
+                for i, (query, params) in enumerate(statements):
+                    subquery = cursor.mogrify(query, params).strip().rstrip(b";")
+                    parts.append(
+                        b"(SELECT COALESCE(json_agg(_q), '[]'::json) FROM (\n"
+                        + subquery
+                        + b"\n) AS _q) AS r%d" % i
+                    )
+                cursor.execute(b"SELECT " + b", ".join(parts))
+                return list(cursor.fetchone())
+
+    async def execute_query_async(
+        self, query: str, params: tuple = None, cache_key: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Run execute_query on a worker thread so the event loop stays free
+
+        Cache hits return immediately. Misses run on their own worker thread
+        and pooled connection, so concurrent calls overlap.
+
+        Args:
+            query: SQL query to execute
+            params: Optional parameters for parameterized queries
+            cache_key: Optional result-cache key, see execute_query
+
+        Returns:
+            List of dictionaries representing query results
+        """
+        cached = self._cached(self._cache_key(query, params, cache_key=cache_key))
+        if cached is not None:
+            return cached
+        return await self._run_in_executor(
+            self.execute_query, query, params, cache_key
+        )
+
+    async def execute_query_raw_async(
+        self, query: str, params: tuple = None, cache_key: Optional[str] = None
+    ) -> Tuple[Tuple[str, ...], List[tuple]]:
+        """Run execute_query_raw on a worker thread so the event loop stays free"""
+        return await self._run_in_executor(
+            self.execute_query_raw, query, params, cache_key
+        )
+
+    async def execute_query_copy_async(
+        self, query: str, params: tuple = None, cache_key: Optional[str] = None
+    ) -> Tuple[Tuple[str, ...], List[tuple]]:
+        """Run execute_query_copy on a worker thread so the event loop stays free"""
+        return await self._run_in_executor(
+            self.execute_query_copy, query, params, cache_key
+        )
+
+    async def execute_selects_async(
+        self, statements: Sequence[Tuple[Any, Optional[tuple]]]
+    ) -> List[List[Dict[str, Any]]]:
+        """Run execute_selects on a worker thread so the event loop stays free"""
+        return await self._run_in_executor(self.execute_selects, statements)
+
+    async def refresh_materialized_view_async(
+        self, name: str, concurrently: bool = True
+    ):
+        """Run refresh_materialized_view on a worker thread"""
+        return await self._run_in_executor(
+            self.refresh_materialized_view, name, concurrently
+        )
+
+    async def describe_table_async(self, table_name: str) -> List[Dict[str, Any]]:
+        """describe_table for the event loop; memoized lookups never leave it"""
+        columns = self._cached_schema(table_name)
+        if columns is None:
+            columns = await self._run_in_executor(self._fetch_schema, table_name)
+        return columns
+
+    async def watch_ddl(self, channel: str = "pg_ddl"):
+        """
+        Drop cached schema and results whenever a DDL notification arrives
+
+        Holds a dedicated connection that LISTENs on the channel the
+        notify_ddl event trigger (database/init.sql) publishes to, and reads
+        it from the event loop rather than tying up a worker thread. Runs
+        until cancelled; raises if the connection is lost.
+
+        Args:
+            channel: Notification channel to listen on
+        """
+        loop = asyncio.get_running_loop()
+        conn = await self._run_in_executor(
+            psycopg2.connect, self.get_connection_string()
+        )
+        conn.autocommit = True
+        fd = conn.fileno()
+        lost = loop.create_future()
+
+        def on_readable():
+            try:
+                conn.poll()
+            except psycopg2.Error as e:
+                loop.remove_reader(fd)
+                if not lost.done():
+                    lost.set_exception(e)
+                return
+            if conn.notifies:
+                conn.notifies.clear()
+                self.invalidate_schema()
+                self.invalidate()
+                # The change may have added or replaced a VOLATILE function
+                reload = loop.run_in_executor(
+                    self._executor, self.reload_volatile_functions
+                )
+                reload.add_done_callback(_log_reload_failure)
+
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(sql.SQL("LISTEN {}").format(sql.Identifier(channel)))
+            # Changes made before LISTEN took effect were never announced
+            self.invalidate_schema()
+            loop.add_reader(fd, on_readable)
+            self._ddl_listening = True
+            await lost
+        finally:
+            self._ddl_listening = False
+            loop.remove_reader(fd)
+            conn.close()
+
+    async def _run_in_executor(self, func, *args):
+        """Run a blocking database call on the pool-sized worker threads"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args)
+        )
 
     def test_connection(self) -> bool:
         """Test if database connection is working"""
@@ -75,3 +845,7 @@ class DatabaseConnection:
         except Exception as e:
             print(f"Database connection test failed: {e}")
             return False
+
+
+# Shared instance, so every importer in a process uses the same connection pool
+db = DatabaseConnection()
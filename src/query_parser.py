@@ -0,0 +1,91 @@
+"""
+SQL parsing and read-only validation for agent-supplied queries
+"""
+import functools
+from typing import Optional
+
+import sqlglot
+from sqlglot import exp
+from sqlglot.dialects.dialect import Dialect
+from sqlglot.tokens import TokenType
+from sqlglot.errors import SqlglotError
+
+# Statements that make a query unsafe wherever they appear, e.g. inside a CTE
+_WRITE_NODES = (
+    exp.Insert,
+    exp.Update,
+    exp.Delete,
+    exp.Merge,
+    exp.Create,
+    exp.Drop,
+    exp.Alter,
+    exp.TruncateTable,
+    exp.Copy,
+    exp.Command,
+    exp.Into,
+)
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_select(query: str) -> Optional[exp.Query]:
+    """
+    Parse a query and return its syntax tree if it is a single read-only query
+
+    Results are cached by query text, so the returned tree is shared and must
+    not be modified.
+
+    Args:
+        query: SQL text in the PostgreSQL dialect
+
+    Returns:
+        The parsed SELECT / set operation, or None if the query is not a
+        single read-only statement (or cannot be parsed)
+    """
+    try:
+        # A comment after the final ";" parses as a separate Semicolon node
+        statements = [
+            tree
+            for tree in sqlglot.parse(query, read="postgres")
+            if tree is not None and not isinstance(tree, exp.Semicolon)
+        ]
+    except SqlglotError:
+        return None
+
+    if len(statements) != 1:
+        return None
+    tree = statements[0]
+    if not isinstance(tree, exp.Query) or tree.find(*_WRITE_NODES):
+        return None
+    return tree
+
+
+@functools.lru_cache(maxsize=1024)
+def normalized_sql(query: str) -> Optional[str]:
+    """
+    Canonical text of a read-only query, for use as a cache key
+
+    Differences in whitespace, keyword case and comments disappear, so
+    equivalent spellings of the same query share one key.
+    """
+    tree = parse_select(query)
+    if tree is None:
+        return None
+    return tree.sql(dialect="postgres", comments=False)
+
+
+@functools.lru_cache(maxsize=1024)
+def statement_text(query: str) -> str:
+    """
+    Query text without trailing semicolons and comments
+
+    Use this to embed a validated query in a larger statement, e.g. as a
+    subquery, where a trailing "; -- note" would otherwise break the wrapper.
+    """
+    tokens = [
+        token
+        for token in Dialect.get_or_raise("postgres").tokenize(query)
+        if token.token_type != TokenType.SEMICOLON
+    ]
+    if not tokens:
+        return ""
+    return query[: tokens[-1].end + 1]
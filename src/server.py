@@ -1,214 +1,364 @@
 """
 MCP Server for Data Analytics with PostgreSQL
 """
-import json
-from typing import Any, Dict, List
+import asyncio
+import os
+import sys
+from typing import Any, Awaitable, Callable, Dict, List
+
+import orjson
 
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
+from sqlglot import exp
 
-from database import DatabaseConnection
+import arrow_ipc
+from database import db
+from query_parser import normalized_sql, parse_select, statement_text
 
 # Initialize the MCP server
 app = Server("data-analytics-mcp")
 
-# Initialize database connection
-db = DatabaseConnection()
 
+# SELECTs without a LIMIT below this many rows are fetched via binary COPY
+COPY_MIN_ROWS = int(os.getenv("COPY_MIN_ROWS", "1000"))
 
-@app.list_tools()
-async def list_tools() -> list[Tool]:
-    """List available MCP tools"""
-    return [
-        Tool(
-            name="query_database",
-            description="Execute SQL queries against the PostgreSQL database. Returns results as JSON.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "SQL query to execute (SELECT statements only for safety)",
-                    }
+# How often the customer_summary materialized view is rebuilt (0 disables)
+CUSTOMER_SUMMARY_REFRESH_SECS = int(os.getenv("CUSTOMER_SUMMARY_REFRESH_SECS", "300"))
+
+
+# query_database never returns more rows than this; larger results are truncated
+QUERY_MAX_ROWS = int(os.getenv("QUERY_MAX_ROWS", "10000"))
+
+
+def _use_copy(tree: exp.Query) -> bool:
+    """Decide whether a SELECT may return enough rows to be worth a binary COPY"""
+    limit = tree.args.get("limit")
+    if limit is None:
+        return True
+    count = limit.expression
+    if isinstance(count, exp.Literal) and count.is_int:
+        return int(count.this) >= COPY_MIN_ROWS
+    return True
+
+
+def _capped(query: str) -> str:
+    """Wrap a SELECT so the server stops after QUERY_MAX_ROWS + 1 rows"""
+    # The extra row tells us whether the result was truncated
+    return (
+        f"SELECT * FROM (\n{statement_text(query)}\n) AS _q "
+        f"LIMIT {QUERY_MAX_ROWS + 1}"
+    )
+
+
+def _json_default(obj: Any) -> Any:
+    """Fallback for values orjson cannot serialize natively, such as Decimal"""
+    # str() keeps NUMERIC values exact instead of rounding them through float
+    return str(obj)
+
+
+def _text(obj: Any) -> TextContent:
+    """Encode a tool response as JSON text content"""
+    return TextContent(
+        type="text", text=orjson.dumps(obj, default=_json_default).decode()
+    )
+
+
+# Tool definitions never change, so build them once instead of per tools/list call
+_TOOLS: list[Tool] = [
+    Tool(
+        name="query_database",
+        description=(
+            "Execute SQL queries against the PostgreSQL database. "
+            "Returns results as JSON."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": (
+                        "SQL query to execute (SELECT statements only for safety)"
+                    ),
+                },
+                "format": {
+                    "type": "string",
+                    "enum": ["rows", "columns", "arrow"],
+                    "description": (
+                        "'rows' returns one object per row (default); "
+                        "'columns' returns column names once plus row arrays; "
+                        "'arrow' returns a base64 Arrow IPC stream"
+                    ),
                 },
-                "required": ["query"],
             },
-        ),
-        Tool(
-            name="list_tables",
-            description="List all tables in the database with their row counts",
-            inputSchema={
-                "type": "object",
-                "properties": {},
+            "required": ["query"],
+        },
+    ),
+    Tool(
+        name="list_tables",
+        description="List all tables in the database with their estimated row counts",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "exact": {
+                    "type": "boolean",
+                    "description": (
+                        "Count rows exactly with COUNT(*) instead of using "
+                        "statistics"
+                    ),
+                }
             },
-        ),
-        Tool(
-            name="describe_table",
-            description="Get the schema/structure of a specific table",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "table_name": {
-                        "type": "string",
-                        "description": "Name of the table to describe",
-                    }
-                },
-                "required": ["table_name"],
+        },
+    ),
+    Tool(
+        name="describe_table",
+        description="Get the schema/structure of a specific table",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "table_name": {
+                    "type": "string",
+                    "description": "Name of the table to describe",
+                }
             },
-        ),
-        Tool(
-            name="get_customer_summary",
-            description="Get a summary of all customers with their activity and revenue",
-            inputSchema={
-                "type": "object",
-                "properties": {},
+            "required": ["table_name"],
+        },
+    ),
+    Tool(
+        name="get_customer_summary",
+        description="Get a summary of all customers with their activity and revenue",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "format": {
+                    "type": "string",
+                    "enum": ["rows", "arrow"],
+                    "description": (
+                        "'rows' returns one object per customer (default); "
+                        "'arrow' returns a base64 Arrow IPC stream"
+                    ),
+                }
             },
+        },
+    ),
+    Tool(
+        name="refresh_customer_summary",
+        description=(
+            "Rebuild the customer summary now instead of waiting for the "
+            "scheduled refresh"
         ),
-    ]
+        inputSchema={
+            "type": "object",
+            "properties": {},
+        },
+    ),
+]
+
+
+@app.list_tools()
+async def list_tools() -> list[Tool]:
+    """List available MCP tools"""
+    return _TOOLS
+
+
+# Tool name -> handler; each handler takes the tool arguments and returns the
+# response object that call_tool serializes
+TOOL_HANDLERS: Dict[str, Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]] = {}
+
+
+def tool(name: str):
+    """Register the decorated coroutine as the handler for an MCP tool"""
+
+    def decorator(func):
+        TOOL_HANDLERS[name] = func
+        return func
+
+    return decorator
+
+
+@tool("query_database")
+async def _query_database(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a read-only SQL query"""
+    query = arguments.get("query", "")
+    
+    # Safety check - only allow a single read-only SELECT (CTEs included)
+    tree = parse_select(query)
+    if tree is None:
+        return {"error": "Only SELECT queries are allowed for safety"}
+    
+    output_format = arguments.get("format", "rows")
+    if output_format == "arrow" and not arrow_ipc.available():
+        return {"error": "format 'arrow' requires pyarrow (pip install pyarrow)"}
+    
+    # Equivalent spellings of a query share one result-cache entry
+    cache_key = normalized_sql(query)
+    tuples = output_format in ("columns", "arrow")
+    if _use_copy(tree):
+        # Unbounded or large: cap the rows server-side so an agent-supplied
+        # SELECT * can't exhaust memory, then fetch through binary COPY
+        columns, results = await db.execute_query_copy_async(
+            _capped(query), None, cache_key
+        )
+        if not tuples:
+            results = [dict(zip(columns, row)) for row in results]
+    elif tuples:
+        columns, results = await db.execute_query_raw_async(query, None, cache_key)
+    else:
+        results = await db.execute_query_async(query, None, cache_key)
+    
+    truncated = len(results) > QUERY_MAX_ROWS
+    if truncated:
+        results = results[:QUERY_MAX_ROWS]
+    
+    response = {"success": True, "rows": len(results), "truncated": truncated}
+    if output_format == "arrow":
+        response["format"] = arrow_ipc.FORMAT
+        response["payload"] = arrow_ipc.encode(columns, results)
+        return response
+    if output_format == "columns":
+        response["columns"] = columns
+    response["data"] = results
+    return response
+
+
+@tool("list_tables")
+async def _list_tables(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """List public tables with column and row counts"""
+    # Row counts are catalog estimates so the whole listing is a
+    # single round-trip instead of one COUNT(*) per table (see
+    # PREPARED_STATEMENTS in database.py for the query)
+    query = "EXECUTE list_public_tables"
+    results = await db.execute_query_async(query)
+    
+    if arguments.get("exact"):
+        # All COUNT(*)s go to the server together in one round-trip
+        counts = await db.execute_selects_async([
+            db.row_count_statement(result["table_name"])
+            for result in results
+        ])
+        results = [
+            {**result, "row_count": count[0]["count"]}
+            for result, count in zip(results, counts)
+        ]
+    
+    return {"success": True, "tables": results}
+
+
+@tool("describe_table")
+async def _describe_table(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the column definitions of a table"""
+    table_name = arguments.get("table_name", "")
+    
+    results = await db.describe_table_async(table_name)
+    
+    return {"success": True, "table_name": table_name, "columns": results}
+
+
+@tool("get_customer_summary")
+async def _get_customer_summary(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the customer_summary view"""
+    query = "SELECT * FROM customer_summary ORDER BY customer_id"
+    if arguments.get("format", "rows") == "arrow":
+        if not arrow_ipc.available():
+            return {"error": "format 'arrow' requires pyarrow (pip install pyarrow)"}
+        columns, results = await db.execute_query_raw_async(query)
+        return {
+            "success": True,
+            "rows": len(results),
+            "format": arrow_ipc.FORMAT,
+            "payload": arrow_ipc.encode(columns, results),
+        }
+    
+    results = await db.execute_query_async(query)
+    
+    return {"success": True, "customers": results}
+
+
+@tool("refresh_customer_summary")
+async def _refresh_customer_summary(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """Refresh the customer_summary materialized view on demand"""
+    await db.refresh_materialized_view_async("customer_summary")
+    
+    return {"success": True, "refreshed": "customer_summary"}
+
+
+async def _refresh_loop():
+    """Periodically refresh customer_summary so reads stay cheap and fresh"""
+    while True:
+        await asyncio.sleep(CUSTOMER_SUMMARY_REFRESH_SECS)
+        try:
+            await db.refresh_materialized_view_async("customer_summary")
+        except Exception as e:
+            # stdout carries the MCP protocol, so report on stderr
+            print(f"customer_summary refresh failed: {e}", file=sys.stderr)
+
+
+async def _ddl_listener():
+    """Keep db.watch_ddl running, reconnecting after connection loss"""
+    while True:
+        try:
+            await db.watch_ddl()
+        except Exception as e:
+            # Until we reconnect, describe_table entries expire by TTL instead
+            print(f"DDL listener failed: {e}", file=sys.stderr)
+        await asyncio.sleep(30)
 
 
 @app.call_tool()
 async def call_tool(name: str, arguments: Any) -> list[TextContent]:
     """Handle tool calls"""
+    handler = TOOL_HANDLERS.get(name)
+    if handler is None:
+        return [_text({"error": f"Unknown tool: {name}"})]
     
     try:
-        if name == "query_database":
-            query = arguments.get("query", "")
-            
-            # Basic safety check - only allow SELECT queries
-            if not query.strip().upper().startswith("SELECT"):
-                return [
-                    TextContent(
-                        type="text",
-                        text=json.dumps({
-                            "error": "Only SELECT queries are allowed for safety"
-                        })
-                    )
-                ]
-            
-            results = db.execute_query(query)
-            return [
-                TextContent(
-                    type="text",
-                    text=json.dumps({
-                        "success": True,
-                        "rows": len(results),
-                        "data": results
-                    }, default=str)
-                )
-            ]
-        
-        elif name == "list_tables":
-            query = """
-                SELECT 
-                    table_name,
-                    (SELECT COUNT(*) 
-                     FROM information_schema.columns 
-                     WHERE table_schema = t.table_schema 
-                     AND table_name = t.table_name) as column_count
-                FROM information_schema.tables t
-                WHERE table_schema = 'public'
-                AND table_type = 'BASE TABLE'
-                ORDER BY table_name;
-            """
-            results = db.execute_query(query)
-            
-            # Get row counts for each table
-            for result in results:
-                table_name = result['table_name']
-                count_query = f"SELECT COUNT(*) as count FROM {table_name}"
-                count_result = db.execute_query(count_query)
-                result['row_count'] = count_result[0]['count']
-            
-            return [
-                TextContent(
-                    type="text",
-                    text=json.dumps({
-                        "success": True,
-                        "tables": results
-                    }, default=str)
-                )
-            ]
-        
-        elif name == "describe_table":
-            table_name = arguments.get("table_name", "")
-            
-            query = """
-                SELECT 
-                    column_name,
-                    data_type,
-                    character_maximum_length,
-                    is_nullable,
-                    column_default
-                FROM information_schema.columns
-                WHERE table_schema = 'public'
-                AND table_name = %s
-                ORDER BY ordinal_position;
-            """
-            results = db.execute_query(query, (table_name,))
-            
-            return [
-                TextContent(
-                    type="text",
-                    text=json.dumps({
-                        "success": True,
-                        "table_name": table_name,
-                        "columns": results
-                    }, default=str)
-                )
-            ]
-        
-        elif name == "get_customer_summary":
-            query = "SELECT * FROM customer_summary ORDER BY customer_id"
-            results = db.execute_query(query)
-            
-            return [
-                TextContent(
-                    type="text",
-                    text=json.dumps({
-                        "success": True,
-                        "customers": results
-                    }, default=str)
-                )
-            ]
-        
-        else:
-            return [
-                TextContent(
-                    type="text",
-                    text=json.dumps({
-                        "error": f"Unknown tool: {name}"
-                    })
-                )
-            ]
-    
+        return [_text(await handler(arguments or {}))]
     except Exception as e:
         return [
-            TextContent(
-                type="text",
-                text=json.dumps({
-                    "error": str(e),
-                    "type": type(e).__name__
-                })
-            )
+            _text({
+                "error": str(e),
+                "type": type(e).__name__
+            })
         ]
 
 
 async def main():
     """Run the MCP server"""
-    # Test database connection before starting
-    if not db.test_connection():
+    # Test database connection (and warm the pool) before starting
+    if not await asyncio.to_thread(db.test_connection):
         print("Error: Could not connect to database")
         return
     
     print("Database connection successful!")
     print("Starting MCP server...")
     
-    async with stdio_server() as (read_stream, write_stream):
-        await app.run(read_stream, write_stream, app.create_initialization_options())
+    refresh_task = None
+    if CUSTOMER_SUMMARY_REFRESH_SECS > 0:
+        refresh_task = asyncio.create_task(_refresh_loop())
+    ddl_task = asyncio.create_task(_ddl_listener())
+    
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await app.run(
+                read_stream, write_stream, app.create_initialization_options()
+            )
+    finally:
+        if refresh_task is not None:
+            refresh_task.cancel()
+        ddl_task.cancel()
+        db.close_all()
+
+
+def run():
+    """Run the server on uvloop when it is installed, else on the default loop"""
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
 
 
 if __name__ == "__main__":
-    import asyncio
-    asyncio.run(main())
+    run()
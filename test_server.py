@@ -9,7 +9,7 @@ import os
 # Add src directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "src"))
 
-from database import DatabaseConnection
+from database import db
 
 
 async def test_mcp_server_import():
@@ -63,6 +63,7 @@ async def test_tool_definitions():
         print("  2. list_tables - List all database tables")
         print("  3. describe_table - Get table schema")
         print("  4. get_customer_summary - Get customer analytics")
+        print("  5. refresh_customer_summary - Rebuild the customer summary")
         
         return True
         
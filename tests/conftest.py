@@ -0,0 +1,7 @@
+"""
+Shared pytest configuration: make the modules in src/ importable
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
@@ -0,0 +1,146 @@
+"""
+Byte-level tests for the binary COPY decoder in copy_binary
+"""
+import struct
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+import copy_binary
+
+INT2, INT4, INT8, BOOL, TEXT, NUMERIC = 21, 23, 20, 16, 25, 1700
+DATE, TIMESTAMP, UUID, JSON, JSONB = 1082, 1114, 2950, 114, 3802
+
+
+def _stream(*rows):
+    """Build a complete COPY stream; each row is a list of field bytes (or None)"""
+    data = copy_binary.SIGNATURE + struct.pack(">ii", 0, 0)
+    for row in rows:
+        data += struct.pack(">h", len(row))
+        for field in row:
+            if field is None:
+                data += struct.pack(">i", -1)
+            else:
+                data += struct.pack(">i", len(field)) + field
+    return data + struct.pack(">h", -1)
+
+
+def _numeric(digits, weight, sign, dscale):
+    return struct.pack(">hhHH", len(digits), weight, sign, dscale) + struct.pack(
+        f">{len(digits)}h", *digits
+    )
+
+
+def _decode_one(field, oid):
+    return copy_binary.decode(_stream([field]), [oid])[0][0]
+
+
+def test_empty_stream():
+    assert copy_binary.decode(_stream(), [INT4]) == []
+
+
+def test_integers_bool_text_and_null():
+    rows = copy_binary.decode(
+        _stream(
+            [
+                struct.pack(">h", -2),
+                struct.pack(">i", 7),
+                struct.pack(">q", 2**40),
+                b"\x01",
+                "héllo".encode(),
+            ],
+            [None, None, None, b"\x00", b""],
+        ),
+        [INT2, INT4, INT8, BOOL, TEXT],
+    )
+    assert rows == [(-2, 7, 2**40, True, "héllo"), (None, None, None, False, "")]
+
+
+@pytest.mark.parametrize(
+    "field, expected",
+    [
+        (_numeric([123, 4500], 0, 0, 2), Decimal("123.45")),
+        (_numeric([1, 5000], 0, 0x4000, 1), Decimal("-1.5")),
+        (_numeric([12], -1, 0, 4), Decimal("0.0012")),  # negative weight
+        (_numeric([1], 1, 0, 0), Decimal("10000")),
+        (_numeric([], 0, 0, 2), Decimal("0.00")),  # zero has no digits
+    ],
+)
+def test_numeric(field, expected):
+    value = _decode_one(field, NUMERIC)
+    assert value == expected
+    # The display scale is kept, as in the text output
+    assert value.as_tuple().exponent == expected.as_tuple().exponent
+
+
+def test_numeric_special_values():
+    assert _decode_one(_numeric([], 0, 0xC000, 0), NUMERIC).is_nan()
+    assert _decode_one(_numeric([], 0, 0xD000, 0), NUMERIC) == Decimal("Infinity")
+    assert _decode_one(_numeric([], 0, 0xF000, 0), NUMERIC) == Decimal("-Infinity")
+
+
+@pytest.mark.parametrize(
+    "days, expected",
+    [
+        (0, date(2000, 1, 1)),
+        (-1, date(1999, 12, 31)),
+        (366, date(2001, 1, 1)),
+        (0x7FFFFFFF, date.max),  # infinity
+        (-0x80000000, date.min),  # -infinity
+    ],
+)
+def test_date(days, expected):
+    assert _decode_one(struct.pack(">i", days), DATE) == expected
+
+
+@pytest.mark.parametrize(
+    "micros, expected",
+    [
+        (0, datetime(2000, 1, 1)),
+        (86_400_000_001, datetime(2000, 1, 2, 0, 0, 0, 1)),
+        (-1, datetime(2000, 1, 1) - timedelta(microseconds=1)),
+        (0x7FFFFFFFFFFFFFFF, datetime.max),  # infinity
+        (-0x8000000000000000, datetime.min),  # -infinity
+    ],
+)
+def test_timestamp(micros, expected):
+    assert _decode_one(struct.pack(">q", micros), TIMESTAMP) == expected
+
+
+def test_uuid_and_json():
+    value = uuid.uuid4()
+    assert _decode_one(value.bytes, UUID) == str(value)
+    assert _decode_one(b'{"a": [1, 2]}', JSON) == {"a": [1, 2]}
+    assert _decode_one(b'\x01{"a": null}', JSONB) == {"a": None}
+
+
+def test_supports():
+    assert copy_binary.supports([INT4, TEXT, NUMERIC, TIMESTAMP])
+    # float4 and timestamptz go through a regular fetch to match psycopg2
+    assert not copy_binary.supports([INT4, 700])
+    assert not copy_binary.supports([1184])
+
+
+def test_rejects_non_copy_data():
+    with pytest.raises(ValueError):
+        copy_binary.decode(b"not a copy stream", [INT4])
+
+
+def test_field_count_mismatch():
+    data = _stream([struct.pack(">i", 1), struct.pack(">i", 2)])
+    with pytest.raises(copy_binary.ShapeError):
+        copy_binary.decode(data, [INT4])
+
+
+def test_value_of_wrong_width():
+    # An int8 column decoded with a stale int4 type
+    with pytest.raises(copy_binary.ShapeError):
+        copy_binary.decode(_stream([struct.pack(">q", 1)]), [INT4])
+
+
+def test_truncated_stream():
+    data = _stream([struct.pack(">i", 1)])[:-4]
+    with pytest.raises(copy_binary.ShapeError):
+        copy_binary.decode(data, [INT4])
@@ -0,0 +1,82 @@
+"""
+Tests for the read-only SQL gate in query_parser
+"""
+import pytest
+
+from query_parser import normalized_sql, parse_select, statement_text
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT * FROM customers",
+        "select customer_id from customers where status = 'active'",
+        "SELECT * FROM customers;",
+        "SELECT * FROM customers; -- all customers",
+        "SELECT * FROM customers; /* all customers */",
+        "-- leading comment\nSELECT 1",
+        "WITH active AS (SELECT * FROM customers WHERE status = 'active') "
+        "SELECT count(*) FROM active",
+        "SELECT customer_id FROM customers UNION SELECT customer_id FROM revenue",
+        "SELECT 'a; DELETE FROM customers' AS s",
+    ],
+)
+def test_accepts_single_read_only_query(query):
+    assert parse_select(query) is not None
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "",
+        "-- only a comment",
+        "not sql at all (",
+        "INSERT INTO customers (customer_name) VALUES ('x')",
+        "UPDATE customers SET status = 'inactive'",
+        "DELETE FROM customers",
+        "DROP TABLE customers",
+        "TRUNCATE customers",
+        "CREATE TABLE t AS SELECT * FROM customers",
+        "COPY customers TO STDOUT",
+        "SELECT * INTO copy_of_customers FROM customers",
+        "WITH d AS (DELETE FROM customers RETURNING *) SELECT * FROM d",
+        "WITH u AS (UPDATE customers SET status = 'x' RETURNING *) SELECT * FROM u",
+        "SELECT 1; SELECT 2",
+        "SELECT 1; DELETE FROM customers",
+        "SELECT 1; -- harmless?\nDELETE FROM customers",
+    ],
+)
+def test_rejects_anything_else(query):
+    assert parse_select(query) is None
+
+
+def test_normalized_sql_ignores_spelling_differences():
+    a = normalized_sql("SELECT * FROM customers WHERE status = 'active'")
+    b = normalized_sql("select *\n  from customers -- note\n where status = 'active';")
+    assert a is not None
+    assert a == b
+
+
+def test_normalized_sql_of_rejected_query_is_none():
+    assert normalized_sql("DELETE FROM customers") is None
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("SELECT 1", "SELECT 1"),
+        ("SELECT 1;", "SELECT 1"),
+        ("SELECT 1 ;  ", "SELECT 1"),
+        ("SELECT * FROM customers; -- all customers", "SELECT * FROM customers"),
+        ("SELECT 1 -- trailing", "SELECT 1"),
+        ("SELECT 'a;' AS x /* c */ ;", "SELECT 'a;' AS x"),
+    ],
+)
+def test_statement_text_strips_trailing_semicolons_and_comments(query, expected):
+    assert statement_text(query) == expected
+
+
+def test_statement_text_can_be_wrapped_in_a_subquery():
+    query = "SELECT * FROM customers; -- all customers"
+    wrapped = f"SELECT * FROM (\n{statement_text(query)}\n) AS _q LIMIT 5"
+    assert parse_select(wrapped) is not None